@@ -1,21 +1,59 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Boolean, LargeBinary, Index, event, inspect, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+import os
+import hashlib
+import logging
+import zlib
+import queue
+import threading
+import time
+import atexit
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
 class Application(Base):
     __tablename__ = 'applications'
+    __table_args__ = (
+        Index('uq_applications_submission', 'email', 'resume_hash', 'job_description_hash', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
-    email = Column(String)
-    resume_content = Column(Text)
-    job_description = Column(Text)
+    email = Column(String, index=True)
+    resume_hash = Column(String(64), index=True)
+    job_description_hash = Column(String(64))
+    _resume_content = Column('resume_content', LargeBinary)
+    _job_description = Column('job_description', LargeBinary)
     score = Column(Float)
     email_status = Column(Boolean, default=False)
+    resume_embedding = Column(LargeBinary)
     created_at = Column(DateTime, default=datetime.now)
 
+    @property
+    def resume_content(self):
+        return decompress_text(self._resume_content)
+
+    @resume_content.setter
+    def resume_content(self, value: str):
+        self._resume_content = compress_text(value)
+
+    @property
+    def job_description(self):
+        return decompress_text(self._job_description)
+
+    @job_description.setter
+    def job_description(self, value: str):
+        self._job_description = compress_text(value)
+
 class ErrorLog(Base):
     __tablename__ = 'error_logs'
     
@@ -23,30 +61,159 @@ class ErrorLog(Base):
     error_message = Column(Text)
     created_at = Column(DateTime, default=datetime.now)
 
-engine = create_engine('sqlite:///applications.db')
+class LLMCache(Base):
+    __tablename__ = 'llm_cache'
+    
+    prompt_hash = Column(String(64), primary_key=True)
+    response = Column(Text)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+# Only job summaries and resume validations are cached; the oldest rows are pruned past this limit.
+LLM_CACHE_MAX_ROWS = 10000
+
+# Sessions are short-lived and opened from the worker threads, so the pool only needs to cover
+# the thread pool plus the error log writer.
+DB_POOL_SIZE = (os.cpu_count() or 1) + 2
+
+DB_LOCK_PATH = 'applications.db.lock'
+
+engine = create_engine(
+    'sqlite:///applications.db',
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_POOL_SIZE
+)
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def compress_text(content: str | None):
+    return zlib.compress(content.encode()) if content is not None else None
+
+def decompress_text(content: bytes | str | None):
+    """
+    Decompress a stored text column. Plain strings from rows written before compression are returned as is.
+    """
+    if content is None or isinstance(content, str):
+        return content
+    return zlib.decompress(content).decode()
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    """
+    Create the tables and migrate older databases. Processes serialize on a lock file next to the
+    database, so concurrent uvicorn workers do not race the migration.
+    """
+    with open(DB_LOCK_PATH, 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        Base.metadata.create_all(bind=engine)
+        _migrate_applications()
+        with engine.begin() as conn:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at)"))
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _migrate_applications():
+    """
+    Add the hash and resume_embedding columns and lookup indexes to databases created before
+    they existed, compress plain-text resume and job description values, and backfill hashes.
+    Duplicate submissions (same email, resume and job description) are collapsed to the most
+    recent row so the unique submission index can be created.
+    """
+    columns = {column['name'] for column in inspect(engine).get_columns('applications')}
+    with engine.begin() as conn:
+        if 'resume_hash' not in columns:
+            conn.execute(text("ALTER TABLE applications ADD COLUMN resume_hash VARCHAR(64)"))
+        if 'job_description_hash' not in columns:
+            conn.execute(text("ALTER TABLE applications ADD COLUMN job_description_hash VARCHAR(64)"))
+        if 'resume_embedding' not in columns:
+            conn.execute(text("ALTER TABLE applications ADD COLUMN resume_embedding BLOB"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_applications_email ON applications (email)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_applications_resume_hash ON applications (resume_hash)"))
+
+        rows = conn.execute(text("""
+            SELECT id, resume_content, job_description FROM applications
+            WHERE (resume_hash IS NULL AND resume_content IS NOT NULL)
+                OR (job_description_hash IS NULL AND job_description IS NOT NULL)
+                OR typeof(resume_content) = 'text' OR typeof(job_description) = 'text'
+        """)).fetchall()
+        for row in rows:
+            resume_content = decompress_text(row.resume_content)
+            job_description = decompress_text(row.job_description)
+            conn.execute(
+                text("""
+                    UPDATE applications
+                    SET resume_content = :resume_content, job_description = :job_description,
+                        resume_hash = :resume_hash, job_description_hash = :job_description_hash
+                    WHERE id = :id
+                """),
+                {
+                    "id": row.id,
+                    "resume_content": compress_text(resume_content),
+                    "job_description": compress_text(job_description),
+                    "resume_hash": hash_content(resume_content) if resume_content is not None else None,
+                    "job_description_hash": hash_content(job_description) if job_description is not None else None
+                }
+            )
 
-def save_application(email: str, resume_content: str, job_description: str, score: float, email_status: bool = False) -> bool:
+        indexes = {index['name']: index['column_names'] for index in inspect(conn).get_indexes('applications')}
+        if indexes.get('uq_applications_submission') != ['email', 'resume_hash', 'job_description_hash']:
+            conn.execute(text("DROP INDEX IF EXISTS uq_applications_submission"))
+            removed = conn.execute(text("""
+                DELETE FROM applications
+                WHERE email IS NOT NULL AND resume_hash IS NOT NULL AND job_description_hash IS NOT NULL
+                AND id NOT IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY email, resume_hash, job_description_hash
+                            ORDER BY email_status DESC, id DESC
+                        ) AS row_number
+                        FROM applications
+                        WHERE email IS NOT NULL AND resume_hash IS NOT NULL AND job_description_hash IS NOT NULL
+                    ) WHERE row_number = 1
+                )
+            """)).rowcount
+            if removed:
+                logger.warning("Removed %d duplicate application rows before creating uq_applications_submission", removed)
+            conn.execute(text(
+                "CREATE UNIQUE INDEX uq_applications_submission "
+                "ON applications (email, resume_hash, job_description_hash)"
+            ))
+
+def save_application(email: str, resume_content: str, job_description: str, score: float, email_status: bool = False, resume_embedding: bytes | None = None) -> bool:
+    """
+    Insert the application, or update its score and email status if the same submission exists.
+    """
     db = SessionLocal()
     try:
-        application = Application(
+        statement = sqlite_insert(Application).values(
             email=email,
-            resume_content=resume_content,
-            job_description=job_description,
+            resume_hash=hash_content(resume_content),
+            job_description_hash=hash_content(job_description),
+            _resume_content=compress_text(resume_content),
+            _job_description=compress_text(job_description),
             score=score,
-            email_status=email_status
+            email_status=email_status,
+            resume_embedding=resume_embedding
         )
-        db.add(application)
+        statement = statement.on_conflict_do_update(
+            index_elements=['email', 'resume_hash', 'job_description_hash'],
+            set_={
+                'score': statement.excluded.score,
+                'email_status': statement.excluded.email_status,
+                'resume_embedding': statement.excluded.resume_embedding
+            }
+        )
+        db.execute(statement)
         db.commit()
         return True
     except Exception:
@@ -65,19 +232,100 @@ def get_application_by_email(email: str):
 def get_application_by_resume(resume_content: str):
     db = SessionLocal()
     try:
-        return db.query(Application).filter(Application.resume_content == resume_content).first()
+        return db.query(Application).filter(
+            Application.resume_hash == hash_content(resume_content)
+        ).first()
     finally:
         db.close()
 
-def insert_error_log(error_message: str):
+def get_resume_embedding(resume_content: str):
+    """
+    Get the stored resume embedding from any earlier application with the same resume content.
+    """
     db = SessionLocal()
     try:
-        error_log = ErrorLog(error_message=error_message)
-        db.add(error_log)
+        row = db.query(Application.resume_embedding).filter(
+            Application.resume_hash == hash_content(resume_content),
+            Application.resume_embedding.isnot(None)
+        ).first()
+        return row.resume_embedding if row else None
+    finally:
+        db.close()
+
+_ERROR_LOG_BATCH_SIZE = 100
+_ERROR_LOG_FLUSH_INTERVAL = 0.1
+_ERROR_LOG_STOP_TIMEOUT = 5
+_error_log_queue: "queue.Queue[str | None]" = queue.Queue()
+_error_log_writer: threading.Thread | None = None
+_error_log_writer_lock = threading.Lock()
+
+def enqueue_error_log(error_message: str):
+    """
+    Queue an error log for the background writer instead of committing it on the caller's thread.
+    The writer is started on first use so logs are persisted outside the app lifecycle too.
+    """
+    writer = _error_log_writer
+    if writer is None or not writer.is_alive():
+        start_error_log_writer()
+    _error_log_queue.put(error_message)
+
+def _write_error_logs(error_messages: list[str]):
+    db = SessionLocal()
+    try:
+        db.add_all([ErrorLog(error_message=message) for message in error_messages])
         db.commit()
+    except Exception:
+        db.rollback()
     finally:
         db.close()
 
+def _drain_error_logs():
+    while True:
+        message = _error_log_queue.get()
+        if message is None:
+            return
+        batch = [message]
+        stop = False
+        deadline = time.monotonic() + _ERROR_LOG_FLUSH_INTERVAL
+        while len(batch) < _ERROR_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                message = _error_log_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if message is None:
+                stop = True
+                break
+            batch.append(message)
+        _write_error_logs(batch)
+        if stop:
+            return
+
+def start_error_log_writer():
+    global _error_log_writer
+    with _error_log_writer_lock:
+        if _error_log_writer is None or not _error_log_writer.is_alive():
+            _error_log_writer = threading.Thread(target=_drain_error_logs, name="error-log-writer", daemon=True)
+            _error_log_writer.start()
+
+def stop_error_log_writer():
+    """
+    Flush queued error logs and stop the background writer, waiting at most a few seconds
+    so a stuck database write cannot hang shutdown.
+    """
+    global _error_log_writer
+    with _error_log_writer_lock:
+        writer = _error_log_writer
+        _error_log_writer = None
+        if writer is not None:
+            _error_log_queue.put(None)
+    if writer is not None:
+        writer.join(timeout=_ERROR_LOG_STOP_TIMEOUT)
+
+atexit.register(stop_error_log_writer)
+
 def update_email_status(email: str, status: bool) -> bool:
     db = SessionLocal()
     try:
@@ -101,8 +349,37 @@ def get_exact_application_match(email: str, resume_content: str, job_description
     try:
         return db.query(Application).filter(
             Application.email == email,
-            Application.resume_content == resume_content,
-            Application.job_description == job_description
+            Application.resume_hash == hash_content(resume_content),
+            Application.job_description_hash == hash_content(job_description)
         ).first()
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_llm_response(prompt_hash: str):
+    """
+    Get the cached LLM response for a prompt hash, or None if it has not been cached.
+    """
+    db = SessionLocal()
+    try:
+        cached = db.query(LLMCache).filter(LLMCache.prompt_hash == prompt_hash).first()
+        return cached.response if cached else None
+    finally:
+        db.close()
+
+def save_llm_response(prompt_hash: str, response: str) -> bool:
+    db = SessionLocal()
+    try:
+        db.merge(LLMCache(prompt_hash=prompt_hash, response=response, created_at=datetime.now()))
+        db.flush()
+        db.execute(text("""
+            DELETE FROM llm_cache WHERE prompt_hash IN (
+                SELECT prompt_hash FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET :max_rows
+            )
+        """), {"max_rows": LLM_CACHE_MAX_ROWS})
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        return False
+    finally:
+        db.close()
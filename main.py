@@ -1,28 +1,44 @@
 from fastapi import FastAPI, UploadFile, Form, File, HTTPException
 import uvicorn
 import os
-import shutil
+import io
 import re
+import hashlib
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
 import fitz
 import docx
 import ollama
 from sentence_transformers import SentenceTransformer
 import resend
 import torch
+import numpy as np
 from dotenv import load_dotenv
 from database import (
     save_application,  
     get_application_by_resume, 
-    insert_error_log,
+    enqueue_error_log,
+    start_error_log_writer,
+    stop_error_log_writer,
     init_db,
     update_email_status,
-    get_exact_application_match
+    get_exact_application_match,
+    get_llm_response,
+    save_llm_response,
+    get_resume_embedding
 )
 from fastapi_mcp import add_mcp_server
 
 load_dotenv()
 
-init_db()
+OLLAMA_MODEL = 'mistral:7b'
+EMAIL_PATTERN = re.compile(r'[\w.-]+@[\w-]+(?:\.[\w-]+)+')
+CHUNK_PATTERN = re.compile(r'[^.,\s][^.,]*')
+ollama_client = ollama.AsyncClient(timeout=120)
 
 app = FastAPI(
     title="Job Application Processor API",
@@ -40,6 +56,163 @@ mcp_server = add_mcp_server(
     describe_full_response_schema=False,    
 )
 
+@app.on_event("startup")
+async def configure_workers():
+    """
+    Sizes the default thread pool used for blocking extraction and scoring work to the CPU count,
+    initializes the database, starts the background error log writer, and loads the
+    SentenceTransformer model before the first request arrives.
+    """
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=os.cpu_count()))
+    await asyncio.to_thread(init_db)
+    start_error_log_writer()
+    await asyncio.to_thread(_get_st_model)
+
+@app.on_event("shutdown")
+def flush_error_logs():
+    stop_error_log_writer()
+
+@lru_cache(maxsize=1)
+def _get_st_model() -> SentenceTransformer:
+    """
+    Loads the SentenceTransformer model once and reuses it across requests.
+    On GPU the weights are cast to FP16; on CPU the model stays in FP32.
+    """
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+    if device == 'cuda':
+        model.half()
+    model.eval()
+    return model
+
+_EMBEDDING_CACHE_SIZE = 2048
+_embedding_cache: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+_model_lock = threading.Lock()
+
+def _split_chunks(text: str) -> list[str]:
+    return list(dict.fromkeys(match.group().rstrip() for match in CHUNK_PATTERN.finditer(text.lower())))
+
+def get_semantic_embeddings(*texts: str) -> list[torch.Tensor]:
+    """
+    Encodes the sentence chunks of each text, cached by the text's content hash.
+    All uncached texts are encoded together in a single batched model call. Model calls are
+    serialized: the tokenizer is not thread-safe and each encode already uses all cores.
+    Embeddings are kept as detached CPU tensors so cached entries do not hold GPU memory.
+    """
+    hashes = [hashlib.blake2b(text.encode(), digest_size=16).hexdigest() for text in texts]
+    found = {}
+    missing = {}
+    with _embedding_cache_lock:
+        for text_hash, text in zip(hashes, texts):
+            if text_hash in _embedding_cache:
+                _embedding_cache.move_to_end(text_hash)
+                found[text_hash] = _embedding_cache[text_hash]
+            else:
+                missing[text_hash] = text
+
+    if missing:
+        missing = {text_hash: _split_chunks(text) for text_hash, text in missing.items()}
+        all_chunks = [chunk for chunks in missing.values() for chunk in chunks]
+        with _model_lock, torch.inference_mode():
+            embeddings = _get_st_model().encode(
+                all_chunks,
+                convert_to_tensor=True,
+                batch_size=64,
+                normalize_embeddings=True
+            ).detach().cpu()
+        offset = 0
+        for text_hash, chunks in missing.items():
+            found[text_hash] = embeddings[offset:offset + len(chunks)].clone()
+            offset += len(chunks)
+        with _embedding_cache_lock:
+            for text_hash in missing:
+                _embedding_cache[text_hash] = found[text_hash]
+            while len(_embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [found[text_hash] for text_hash in hashes]
+
+_LLM_CACHE_SIZE = 1024
+_llm_cache: "OrderedDict[str, str]" = OrderedDict()
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256((OLLAMA_MODEL + prompt).encode()).hexdigest()
+
+async def _get_cached_response(prompt: str):
+    """
+    Looks up a cached Ollama response in process first, then in the llm_cache table.
+    """
+    prompt_hash = _prompt_hash(prompt)
+    if prompt_hash in _llm_cache:
+        _llm_cache.move_to_end(prompt_hash)
+        return _llm_cache[prompt_hash]
+    content = await asyncio.to_thread(get_llm_response, prompt_hash)
+    if content is not None:
+        _remember_response(prompt_hash, content)
+    return content
+
+async def _cache_response(prompt: str, content: str):
+    prompt_hash = _prompt_hash(prompt)
+    await asyncio.to_thread(save_llm_response, prompt_hash, content)
+    _remember_response(prompt_hash, content)
+
+def _remember_response(prompt_hash: str, content: str):
+    _llm_cache[prompt_hash] = content
+    while len(_llm_cache) > _LLM_CACHE_SIZE:
+        _llm_cache.popitem(last=False)
+
+async def _chat(prompt: str, format: str = ''):
+    """
+    Sends a prompt to Ollama without caching.
+    
+    Args:
+        prompt (str): The prompt to send.
+        format (str): Ollama output format; 'json' constrains the response to valid JSON.
+    
+    Returns:
+        str | None: The model's response content, or None if the model returned no message.
+    """
+    response = await ollama_client.chat(
+        model=OLLAMA_MODEL,
+        messages=[
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        stream=False,
+        format=format,
+        options={
+            "temperature": 0.1,
+        }
+    )
+    if not response or 'message' not in response:
+        return None
+    return response['message']['content']
+
+async def _cached_chat(prompt: str):
+    """
+    Sends a prompt to Ollama, caching the response by a hash of the model and prompt.
+    
+    Returns:
+        str | None: The model's response content, or None if the model returned no message.
+    """
+    content = await _get_cached_response(prompt)
+    if content is None:
+        content = await _chat(prompt)
+        if content is not None:
+            await _cache_response(prompt, content)
+    return content
+
+def _pdf_text(doc) -> str:
+    # Default text flags without ligature and whitespace preservation, which are not needed for scoring.
+    flags = fitz.TEXTFLAGS_TEXT & ~(fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE)
+    return "\n".join(page.get_text("text", flags=flags) for page in doc)
+
+def _docx_text(doc) -> str:
+    return "\n".join(para.text for para in doc.paragraphs)
+
 @mcp_server.tool()
 def extract_text(file_path: str) -> str:
     """
@@ -56,33 +229,48 @@ def extract_text(file_path: str) -> str:
     """
     try:
         if file_path.endswith(".pdf"):
-            doc = fitz.open(file_path)
-            text = "\n".join([page.get_text("text") for page in doc])
+            with fitz.open(file_path) as doc:
+                text = _pdf_text(doc)
         elif file_path.endswith(".docx"):
-            doc = docx.Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
+            text = _docx_text(docx.Document(file_path))
         else:
             raise ValueError("Unsupported file format. Upload PDF or DOCX.")
         return text.strip()
     except Exception as e:
         error_message = f"Error occurred during extracting the text from the resume: {e}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         raise
 
-
-@mcp_server.tool()
-def generate_summary(job_description: str) -> str:
+def extract_text_from_bytes(data: bytes, file_type: str) -> str:
     """
-    Uses Ollama to create a focused summary of job requirements in a single paragraph.
+    Extracts text from in-memory DOCX or PDF content without writing it to disk.
     
     Args:
-        job_description (str): The job description text to summarize.
+        data (bytes): The raw content of the PDF or DOCX file.
+        file_type (str): The file extension, either "pdf" or "docx".
     
     Returns:
-        str: A concise paragraph summarizing the key requirements and skills.
+        str: Extracted text from the file.
+    
+    Raises:
+        ValueError: If the file format is not supported (must be PDF or DOCX).
     """
     try:
-        prompt = """
+        if file_type == "pdf":
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                text = _pdf_text(doc)
+        elif file_type == "docx":
+            text = _docx_text(docx.Document(io.BytesIO(data)))
+        else:
+            raise ValueError("Unsupported file format. Upload PDF or DOCX.")
+        return text.strip()
+    except Exception as e:
+        error_message = f"Error occurred during extracting the text from the resume: {e}"
+        enqueue_error_log(error_message)
+        raise
+
+
+JOB_SUMMARY_PROMPT = """
         Create a single, concise paragraph that summarizes ALL key requirements and skills from this job description. 
         Focus on technical skills, qualifications, experience levels, and essential requirements.
         Include specific technologies, tools, education, and experience requirements.
@@ -95,28 +283,60 @@ def generate_summary(job_description: str) -> str:
         Job Description to analyze:
         {job_description}
         """
-        
-        response = ollama.chat(
-            model='mistral:7b',
-            messages=[
-                {
-                    'role': 'user',
-                    'content': prompt.format(job_description=job_description)
-                }
-            ],
-            stream=False,
-            options={
-                "temperature": 0.1,
-            }
-        )
-        if not response or 'message' not in response:
-            return "Failed to extract requirements: No response from model"
-        return response['message']['content'].strip()
+
+async def _summarize_job(job_description: str) -> str:
+    """
+    Summarizes the job description with Ollama, raising instead of returning an error string.
+    """
+    response = await _cached_chat(JOB_SUMMARY_PROMPT.format(job_description=job_description))
+    if response is None:
+        raise ValueError("Failed to extract requirements: No response from model")
+    return response.strip()
+
+@mcp_server.tool()
+async def generate_summary(job_description: str) -> str:
+    """
+    Uses Ollama to create a focused summary of job requirements in a single paragraph.
+    
+    Args:
+        job_description (str): The job description text to summarize.
+    
+    Returns:
+        str: A concise paragraph summarizing the key requirements and skills.
+    """
+    try:
+        return await _summarize_job(job_description)
     except Exception as e:
         error_message = f"Error occurred during generating the summary of the job description from Ollama: {e}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return str(e)
 
+def _mean_vector(embeddings: torch.Tensor) -> np.ndarray:
+    vector = embeddings.mean(dim=0).numpy().astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+def _score_application(resume_text: str, job_summary: str, resume_vector: np.ndarray | None = None):
+    """
+    Scores a resume against a job summary, reusing a precomputed resume vector when one is given
+    so that only the job summary has to be encoded.
+    
+    Returns:
+        tuple: (score, resume_vector). resume_vector is the normalized mean-pooled resume embedding,
+        or None if the job summary was empty and nothing was encoded.
+    """
+    if not job_summary or job_summary.startswith("Failed to extract"):
+        return 0.0, resume_vector
+    
+    if resume_vector is None:
+        resume_embeddings, job_embeddings = get_semantic_embeddings(resume_text, job_summary)
+        resume_vector = _mean_vector(resume_embeddings)
+    else:
+        job_embeddings, = get_semantic_embeddings(job_summary)
+    job_vector = _mean_vector(job_embeddings)
+    similarity = float(np.dot(resume_vector, job_vector))
+    
+    return round(min(100.0, max(0.0, similarity * 100)), 2), resume_vector
+
 @mcp_server.tool()
 def calculate_score(resume_text: str, job_summary: str) -> float:
     """
@@ -130,31 +350,12 @@ def calculate_score(resume_text: str, job_summary: str) -> float:
         float: A similarity score between 0 and 100.
     """
     try:
-        if not job_summary or job_summary.startswith("Failed to extract"):
-            return 0.0
-        
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        def get_semantic_embeddings(text: str):
-            chunks = [s.strip() for s in text.lower().split('.') if s.strip()]
-            chunks.extend([p.strip() for s in chunks for p in s.split(',') if p.strip()])
-            return model.encode(chunks, convert_to_tensor=True)
-        
-        
-        resume_embeddings = get_semantic_embeddings(resume_text)
-        job_embeddings = get_semantic_embeddings(job_summary)
-        
-        similarity = torch.cosine_similarity(
-            torch.mean(resume_embeddings, dim=0).unsqueeze(0),
-            torch.mean(job_embeddings, dim=0).unsqueeze(0)
-        ).item()
-        
-        final_score = round(min(100.0, max(0.0, similarity * 100)), 2)
+        final_score, _ = _score_application(resume_text, job_summary)
         return final_score
         
     except Exception as e:
         error_message = f"Error occurred during calculating the cosine similarity score: {e}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return str(e)
 
 @mcp_server.tool()
@@ -169,12 +370,12 @@ def extract_email(text: str) -> str:
         str: The first email address found, or an empty string if none is found.
     """
     try:
-        match = re.search(r'[\w\.-]+@[\w\.-]+', text)
+        match = EMAIL_PATTERN.search(text)
         result = match.group(0) if match else ""
         return result
     except Exception as e:
         error_message = f"Error occurred during extracting the email from the resume: {e}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return str(e)
 @mcp_server.tool()
 def send_email(email: str, subject: str, body: str) -> bool:
@@ -202,9 +403,23 @@ def send_email(email: str, subject: str, body: str) -> bool:
         return True
     except Exception as e:
         error_message = f"Error occurred during sending the email from Resend tool: {str(e)}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return False
 
+def _send_interview_email(email: str, score: float) -> bool:
+    booking_link = "https://interview-slot-test.youcanbook.me/"
+    
+    subject = "Interview Invitation - Next Steps"
+    body = f"""
+Congratulations! Based on your application review (Match Score: {score}%), we would like to invite you for an interview.
+Once you select a time slot, you will receive a detailed confirmation email with meeting instructions.
+Please schedule your interview using the link below:
+{booking_link}
+Best regards,
+Your Company Name
+"""
+    return send_email(email, subject, body)
+
 @mcp_server.tool()
 def send_interview_invitation(email: str, score: float) -> bool:
     """
@@ -218,25 +433,13 @@ def send_interview_invitation(email: str, score: float) -> bool:
         bool: True if the email was sent successfully, False otherwise.
     """
     try:
-        booking_link = "https://interview-slot-test.youcanbook.me/"
-        
-        subject = "Interview Invitation - Next Steps"
-        body = f"""
-Congratulations! Based on your application review (Match Score: {score}%), we would like to invite you for an interview.
-Once you select a time slot, you will receive a detailed confirmation email with meeting instructions.
-Please schedule your interview using the link below:
-{booking_link}
-Best regards,
-Your Company Name
-"""
-        
-        if send_email(email, subject, body):
+        if _send_interview_email(email, score):
             update_email_status(email, True)
             return True
         return False
     except Exception as e:
         error_message = f"Error occurred during sending the interview invitation email: {str(e)}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return False
 
 @mcp_server.tool()
@@ -257,22 +460,10 @@ def check_existing_application(resume_text: str):
         return None, None
     except Exception as e:
         error_message = f"Error occurred during checking the existing application in the database: {e}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return str(e)
 
-@mcp_server.tool()
-def validate_resume(text: str) -> bool:
-    """
-    Validates if the extracted text is from a resume document.
-    
-    Args:
-        text (str): The extracted text from the document.
-    
-    Returns:
-        bool: True if the document is a resume, False otherwise.
-    """
-    try:
-        prompt = """
+RESUME_VALIDATION_PROMPT = """
         Analyze the following text and determine if it is from a resume/CV document.
         A resume typically contains:
         - Personal information (name, contact details)
@@ -289,31 +480,105 @@ def validate_resume(text: str) -> bool:
         Text to analyze:
         {text}
         """
-        
-        response = ollama.chat(
-            model='mistral:7b',
-            messages=[
-                {
-                    'role': 'user',
-                    'content': prompt.format(text=text)
-                }
-            ],
-            stream=False,
-            options={
-                "temperature": 0.1,
-            }
-        )
-        
-        if not response or 'message' not in response:
+
+@mcp_server.tool()
+async def validate_resume(text: str) -> bool:
+    """
+    Validates if the extracted text is from a resume document.
+    
+    Args:
+        text (str): The extracted text from the document.
+    
+    Returns:
+        bool: True if the document is a resume, False otherwise.
+    """
+    try:
+        response = await _cached_chat(RESUME_VALIDATION_PROMPT.format(text=text))
+        if response is None:
             return False
             
-        result = response['message']['content'].strip().lower()
+        result = response.strip().lower()
         return result == 'true'
     except Exception as e:
         error_message = f"Error occurred during resume validation: {str(e)}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         return False
 
+COMBINED_ANALYSIS_PROMPT = """
+    You are given a document and a job description.
+    
+    1. Determine if the document is from a resume/CV. A resume typically contains personal information,
+       a professional summary, work experience, education, skills, and projects or achievements.
+       Go through the document thoroughly before deciding.
+    2. If it is a resume, create a single, concise paragraph that summarizes ALL key requirements and skills
+       from the job description. Focus on technical skills, qualifications, experience levels, and essential
+       requirements, including specific technologies, tools, education, and experience requirements.
+    
+    Return ONLY a JSON object with the keys "is_resume" (boolean) and "job_summary" (string, empty if
+    the document is not a resume).
+    
+    Document to analyze:
+    {resume_text}
+    
+    Job Description to analyze:
+    {job_description}
+    """
+
+async def _analyze_application(resume_text: str, job_description: str) -> tuple[bool, str]:
+    """
+    Validates the resume and summarizes the job description.
+    Cached validation and summary responses are reused first; the combined Ollama call only runs
+    when both miss, and its results are stored under the standalone prompts' cache keys.
+    
+    Returns:
+        tuple: (is_resume, job_summary). job_summary is empty when the document is not a resume.
+    
+    Raises:
+        Exception: If the job summary could not be generated.
+    """
+    validation_prompt = RESUME_VALIDATION_PROMPT.format(text=resume_text)
+    summary_prompt = JOB_SUMMARY_PROMPT.format(job_description=job_description)
+    cached_validation = await _get_cached_response(validation_prompt)
+    cached_summary = await _get_cached_response(summary_prompt)
+
+    if cached_validation is not None or cached_summary is not None:
+        if cached_validation is not None:
+            is_resume = cached_validation.strip().lower() == 'true'
+        else:
+            is_resume = await validate_resume(resume_text)
+        if not is_resume:
+            return False, ""
+        if cached_summary is not None:
+            return True, cached_summary.strip()
+        return True, await _summarize_job(job_description)
+
+    is_resume, job_summary = None, ""
+    try:
+        response = await _chat(
+            COMBINED_ANALYSIS_PROMPT.format(resume_text=resume_text, job_description=job_description),
+            format='json'
+        )
+        result = json.loads(response) if response else {}
+        is_resume = result.get('is_resume')
+        if isinstance(is_resume, str):
+            is_resume = is_resume.strip().lower() == 'true'
+        job_summary = str(result.get('job_summary') or '').strip()
+        if isinstance(is_resume, bool):
+            await _cache_response(validation_prompt, 'true' if is_resume else 'false')
+            if is_resume and job_summary:
+                await _cache_response(summary_prompt, job_summary)
+    except Exception as e:
+        enqueue_error_log(f"Error occurred during the combined resume validation and job summary call: {e}")
+
+    if not isinstance(is_resume, bool):
+        is_resume = await validate_resume(resume_text)
+        job_summary = ""
+    if not is_resume:
+        return False, ""
+    if not job_summary:
+        job_summary = await _summarize_job(job_description)
+    return True, job_summary
+
 @app.post("/job-application", tags=["job-application"])
 async def process_application(
     file: UploadFile = File(..., description="The resume file in PDF or DOCX format"),
@@ -322,7 +587,7 @@ async def process_application(
     """
     Process a job application by extracting resume content, calculating a match score, and sending an interview invitation if the score is high.
 
-    - Saves the uploaded resume file.
+    - Reads the uploaded resume file in memory.
     - Extracts text and email from the resume.
     - Checks for existing applications in the database.
     - If same email exists:
@@ -347,57 +612,48 @@ async def process_application(
     """
     try:
         if not file.filename.lower().endswith(('.pdf', '.docx')):
-            insert_error_log(f"Invalid file format. Only PDF and DOCX files are supported. File name: {file.filename}")
+            enqueue_error_log(f"Invalid file format. Only PDF and DOCX files are supported. File name: {file.filename}")
             raise HTTPException(
                 status_code=400,
                 detail="Invalid file format. Only PDF and DOCX files are supported."
             ) 
 
-        file_path = f"uploads/{file.filename}"
-        os.makedirs("uploads", exist_ok=True)
+        file_type = file.filename.rsplit(".", 1)[-1].lower()
         
         try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            data = await file.read()
         except Exception as e:
-            insert_error_log(f"Failed to save uploaded file: {str(e)}")
+            enqueue_error_log(f"Failed to read uploaded file: {str(e)}")
             raise HTTPException(
                 status_code=500,
-                detail=f"Failed to save uploaded file: {str(e)}"
+                detail=f"Failed to read uploaded file: {str(e)}"
             )
 
         try:
-            resume_content = extract_text(file_path)
+            resume_content = await asyncio.to_thread(extract_text_from_bytes, data, file_type)
         except ValueError as e:
-            insert_error_log(f"Value error occurred during extracting the text from the resume: {str(e)}")
+            enqueue_error_log(f"Value error occurred during extracting the text from the resume: {str(e)}")
             raise HTTPException(
                 status_code=400,
                 detail=str(e)
             )
         except Exception as e:
-            insert_error_log(f"Failed to extract text from resume: {str(e)}")
+            enqueue_error_log(f"Failed to extract text from resume: {str(e)}")
             raise HTTPException(
                 status_code=422,
                 detail=f"Failed to extract text from resume: {str(e)}"
             )
 
-        if not validate_resume(resume_content):
-            insert_error_log("Uploaded document is not a resume")
-            raise HTTPException(
-                status_code=400,
-                detail="The uploaded document does not appear to be a resume. Please upload a valid resume document."
-            )
-
         email = extract_email(resume_content)
         if not email:
-            insert_error_log("No email address found in resume")
+            enqueue_error_log("No email address found in resume")
             raise HTTPException(
                 status_code=400,
                 detail="No email address found in resume"
             )
 
         try:
-            existing_app = get_exact_application_match(email, resume_content, job_description)
+            existing_app = await asyncio.to_thread(get_exact_application_match, email, resume_content, job_description)
             email_sent = False
             email_message = ""
             
@@ -410,30 +666,31 @@ async def process_application(
                 }
             
             try:
-                job_summary = generate_summary(job_description)
-                if isinstance(job_summary, str) and job_summary.startswith("Error"):
-                    insert_error_log(f"Not an exception but failed to generate job summary: {job_summary}")
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"Failed to generate job summary: {job_summary}"
-                    )
+                is_resume, job_summary = await _analyze_application(resume_content, job_description)
             except Exception as e:
-                insert_error_log(f"Exception occured: Failed to generate job summary: {str(e)}")
+                enqueue_error_log(f"Exception occured: Failed to generate job summary: {str(e)}")
                 raise HTTPException(
                     status_code=422,
                     detail=f"Failed to generate job summary: {str(e)}"
                 )
+            if not is_resume:
+                enqueue_error_log("Uploaded document is not a resume")
+                raise HTTPException(
+                    status_code=400,
+                    detail="The uploaded document does not appear to be a resume. Please upload a valid resume document."
+                )
 
             try:
-                score = calculate_score(resume_content, job_summary)
-                if not isinstance(score, float):
-                    insert_error_log(f"Not an exception but failed to calculate score: {score}")
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"Failed to calculate score: {score}"
-                    )
+                stored_embedding = await asyncio.to_thread(get_resume_embedding, resume_content)
+                stored_vector = None
+                if stored_embedding is not None:
+                    stored_vector = np.frombuffer(stored_embedding, dtype=np.float16).astype(np.float32)
+                    stored_vector /= np.linalg.norm(stored_vector)
+                score, resume_vector = await asyncio.to_thread(
+                    _score_application, resume_content, job_summary, stored_vector
+                )
             except Exception as e:
-                insert_error_log(f"Exception occured: Failed to calculate score: {str(e)}")
+                enqueue_error_log(f"Exception occured: Failed to calculate score: {str(e)}")
                 raise HTTPException(
                     status_code=422,
                     detail=f"Failed to calculate score: {str(e)}"
@@ -442,19 +699,22 @@ async def process_application(
             if score >= 70:
                 email_message = "Candidate has passed the eligibility for interview"
                 try:
-                    if send_interview_invitation(email, score):
+                    if await asyncio.to_thread(_send_interview_email, email, score):
                         email_sent = True
                         email_message += " and interview invitation sent successfully"
                     else:
                         email_message += ", but failed to send the email"
                 except Exception as e:
                     email_message += ", but failed to send the email"
-                    insert_error_log(f"Failed to send interview invitation: {str(e)}")
+                    enqueue_error_log(f"Failed to send interview invitation: {str(e)}")
             else:
                 email_message = "Candidate did not meet the minimum score requirement"
             
             try:
-                save_application(email, resume_content, job_description, score, email_sent)
+                resume_embedding = resume_vector.astype(np.float16).tobytes() if resume_vector is not None else None
+                await asyncio.to_thread(
+                    save_application, email, resume_content, job_description, score, email_sent, resume_embedding
+                )
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
@@ -480,11 +740,13 @@ async def process_application(
         raise
     except Exception as e:
         error_message = f"Error occurred during processing the job application: {str(e)}"
-        insert_error_log(error_message)
+        enqueue_error_log(error_message)
         raise HTTPException(
             status_code=500,
             detail=error_message
         )
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
+    # Multiple workers need an import string, so each worker imports the module again.
+    uvicorn.run("main:app" if workers > 1 else app, host="127.0.0.1", port=8000, workers=workers)
\ No newline at end of file